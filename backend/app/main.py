@@ -1,32 +1,48 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 import os
+import queue
 import shutil
+import threading
 from pathlib import Path
 import uuid
 from datetime import datetime
 import gc
+import logging
+from functools import lru_cache
 
 from app.services.video_processor import VideoProcessor
 from app.services.pose_estimator import PoseEstimator
-from app.services.reconstruction import PoseReconstructor
 from app.services.analytics_engine import AnalyticsEngine
 
+logger = logging.getLogger("pipeline")
+logger.setLevel(logging.INFO)
+# uvicorn only attaches handlers to its own loggers, so without one here
+# the per-job INFO lines would be dropped; the guard keeps re-imports in
+# pool workers from stacking duplicate handlers
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_handler)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI 3D Posture & Motion Analytics API",
     description="Backend API for AI-powered pose estimation and motion analytics",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Configure CORS
+# Configure CORS: no "*" entry (browsers reject it with credentials), and
+# let browsers cache the preflight response for a day
 origins = [
     "http://localhost:5173",  # Local frontend
     "http://localhost:3000",  # Alternative local
     "https://3d-posture-analytics-ai.vercel.app",  # Production frontend
     "https://3d-posture-analytics-ai.vercel.app/",
-    "*"  # Fallback (might be ignored by some browsers with credentials)
 ]
 
 app.add_middleware(
@@ -35,6 +51,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 # Create necessary directories
@@ -43,11 +60,114 @@ OUTPUT_DIR = Path("outputs")
 UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-# Initialize services
-video_processor = VideoProcessor()
-pose_estimator = PoseEstimator()
-pose_reconstructor = PoseReconstructor()
-analytics_engine = AnalyticsEngine()
+# Spool uploads to a memory-backed tmpfs when the host has one so the video
+# bytes are never written to and re-read from disk; cv2.VideoCapture needs a
+# real path, so this is the closest to in-memory decode without a new
+# decoder dependency
+SPOOL_DIR = Path("/dev/shm") if Path("/dev/shm").is_dir() else UPLOAD_DIR
+
+# Services are constructed lazily on first use so importing this module
+# (and answering /health probes) does not pay the MediaPipe model-load cost
+@lru_cache(maxsize=1)
+def get_video_processor() -> VideoProcessor:
+    return VideoProcessor()
+
+
+@lru_cache(maxsize=1)
+def get_pose_estimator() -> PoseEstimator:
+    return PoseEstimator()
+
+
+@lru_cache(maxsize=1)
+def get_analytics_engine() -> AnalyticsEngine:
+    return AnalyticsEngine()
+
+
+# Worker pool for the CPU-bound processing pipeline; each worker re-imports
+# this module and gets its own service instances
+POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+_PREFETCH_END = object()
+
+
+def _prefetch(gen, maxsize: int = 8):
+    """
+    Drive a generator on a background thread through a bounded queue
+
+    Lets video decode run ahead of pose inference instead of the two
+    strictly alternating; the bound keeps at most a few frames in flight.
+
+    If the consumer stops early (e.g. pose inference raises mid-clip),
+    the producer notices via the stop flag instead of blocking forever
+    on a full queue, and closing the source generator runs its cleanup
+    (which is what reaps a decoder subprocess).
+    """
+    q = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def producer():
+        try:
+            for item in gen:
+                if not put(item):
+                    return
+            put(_PREFETCH_END)
+        except BaseException as exc:
+            put(exc)
+        finally:
+            gen.close()
+
+    threading.Thread(target=producer, daemon=True).start()
+
+    try:
+        while True:
+            item = q.get()
+            if item is _PREFETCH_END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        while not q.empty():
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                break
+
+
+def _pipeline(video_path: str) -> dict:
+    """
+    Run the full decode -> pose estimation -> analytics pipeline
+
+    Top-level function so it is picklable and can run in a worker process.
+    """
+    # Use generator to save memory (resizes to 360p max width for speed);
+    # prefetch so decode and colour conversion overlap with MediaPipe
+    # inference on the consumer side
+    frame_generator = _prefetch(get_video_processor().stream_rgb_frames(video_path, max_width=360))
+    pose_data = get_pose_estimator().process_frames(frame_generator, already_rgb=True)
+
+    # Force garbage collection
+    gc.collect()
+
+    try:
+        analytics = get_analytics_engine().compute_analytics(pose_data)
+    except Exception as analytics_error:
+        logger.warning("Analytics computation failed: %s", analytics_error)
+        analytics = {}  # Gracefully degrade if analytics fail
+
+    # Plain list so the result pickles cleanly back to the server process
+    return {"frames": list(pose_data), "analytics": analytics}
 
 
 @app.get("/")
@@ -70,13 +190,13 @@ async def health_check():
 
 
 @app.post("/api/upload")
-def upload_video(file: UploadFile = File(...)):
+async def upload_video(file: UploadFile = File(...)):
     """
     Upload a video file for pose estimation and analytics
-    
+
     Args:
         file: Video file (MP4, MOV, AVI)
-    
+
     Returns:
         JSON with 3D pose data and analytics
     """
@@ -84,49 +204,57 @@ def upload_video(file: UploadFile = File(...)):
         # Validate file type
         allowed_extensions = {'.mp4', '.mov', '.avi'}
         file_ext = Path(file.filename).suffix.lower()
-        
+
         if file_ext not in allowed_extensions:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
             )
-        
+
         # Generate unique job ID
         job_id = str(uuid.uuid4())
-        
-        # Save uploaded file
-        video_path = UPLOAD_DIR / f"{job_id}{file_ext}"
+
+        # Save uploaded file: in-kernel copy when the upload spooled to a
+        # real file, otherwise stream with 1 MiB chunks instead of the
+        # 16 KiB copyfileobj default
+        video_path = SPOOL_DIR / f"{job_id}{file_ext}"
         with open(video_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        print(f"[{job_id}] Video uploaded: {file.filename}")
-        
-        # Step 1 & 2: Stream frames and run pose estimation
-        print(f"[{job_id}] Processing video stream...")
-        # Use generator to save memory (resizes to 360p max width for speed)
-        frame_generator = video_processor.stream_frames(str(video_path), max_width=360)
-        pose_data = pose_estimator.process_frames(frame_generator)
-        print(f"[{job_id}] Processed {len(pose_data)} frames")
-        
-        # Force garbage collection
-        gc.collect()
-        
-        # Step 3: Reconstruct 3D poses - SKIPPED (PoseEstimator now does 3D)
-        
-        # Step 4: Compute analytics
-        print(f"[{job_id}] Computing analytics...")
-        try:
-            analytics = analytics_engine.compute_analytics(pose_data)
-            print(f"[{job_id}] Analytics complete")
-        except Exception as analytics_error:
-            print(f"[{job_id}] Analytics computation failed: {analytics_error}")
-            analytics = {}  # Gracefully degrade if analytics fail 
-        
+            src = file.file
+            try:
+                # One sendfile call copies at most ~2 GiB on Linux, so
+                # loop on the returned count until the source is drained
+                size = os.fstat(src.fileno()).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(buffer.fileno(), src.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            except (AttributeError, OSError, ValueError):
+                # Discard any partial in-kernel copy and restart from the
+                # top of both files, otherwise the fallback would append
+                # the whole source after the partially written bytes
+                buffer.seek(0)
+                buffer.truncate()
+                src.seek(0)
+                shutil.copyfileobj(src, buffer, length=1 << 20)
+
+        logger.info("[%s] Video uploaded: %s", job_id, file.filename)
+
+        # Run the CPU-bound pipeline on a worker process so the event loop
+        # stays free for other requests
+        logger.info("[%s] Processing video stream...", job_id)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(POOL, _pipeline, str(video_path))
+        pose_data = result["frames"]
+        analytics = result["analytics"]
+        logger.info("[%s] Processed %d frames, analytics complete", job_id, len(pose_data))
+
         # Clean up uploaded video
         video_path.unlink()
-        
+
         # Return results EXACTLY as requested
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "job_id": job_id,
             "filename": file.filename,
             "frames_processed": len(pose_data),
@@ -134,9 +262,9 @@ def upload_video(file: UploadFile = File(...)):
             "analytics": analytics,
             "status": "success"
         })
-        
+
     except Exception as e:
-        print(f"[ERROR] {str(e)}")
+        logger.exception("Processing failed: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Processing failed: {str(e)}"
@@ -147,12 +275,17 @@ def upload_video(file: UploadFile = File(...)):
 async def cleanup_job(job_id: str):
     """Clean up temporary files for a job"""
     try:
-        # Remove any leftover files
-        for file in UPLOAD_DIR.glob(f"{job_id}*"):
-            file.unlink()
-        for file in OUTPUT_DIR.glob(f"{job_id}*"):
-            file.unlink()
-        
+        # Remove any leftover files; scandir with a prefix check avoids the
+        # per-entry Path construction and fnmatch that glob would do
+        for directory in {UPLOAD_DIR, OUTPUT_DIR, SPOOL_DIR}:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith(job_id):
+                        try:
+                            os.unlink(entry.path)
+                        except FileNotFoundError:
+                            pass
+
         return {"status": "cleaned", "job_id": job_id}
     
     except Exception as e:
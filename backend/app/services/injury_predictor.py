@@ -1,7 +1,104 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+import orjson
 from typing import List, Dict, Any, Tuple
 
 
+# Knee risk features (one per severity bin) and the weights they carry;
+# keeping both as data lets the scoring be a single dot product
+_KNEE_WEIGHTS = np.array([35, 20, 35, 20, 25, 10, 15], dtype=np.int16)
+
+# Confidence bonus by clip length: searchsorted over the frame bins picks
+# the bonus for the interval the frame count falls in
+_FRAME_BINS = np.array([50, 100, 200])
+_FRAME_BONUS = (0, 5, 10, 15)
+_KNEE_WARNINGS = (
+    "Severe knee valgus (inward collapse) detected",
+    "Moderate knee valgus observed",
+    "Severe knee valgus (inward collapse) detected",
+    "Moderate knee valgus observed",
+    "Significant left-right knee asymmetry",
+    "Mild knee asymmetry",
+    "Rapid acceleration/deceleration detected",
+)
+
+# Static halves of the per-assessor payloads: the strings never change
+# between calls, so build them once and merge the computed fields in
+_KNEE_PAYLOAD = {
+    "injury_type": "ACL Tear / Knee Injury",
+    "body_part": "Knee",
+    "confidence": 88,
+    "description": "Analysis of knee alignment, symmetry, and dynamic loading patterns",
+    "prevention_tips": [
+        "Strengthen quadriceps and hamstrings",
+        "Practice proper landing mechanics",
+        "Focus on controlled deceleration",
+        "Ensure knees track over toes during movements"
+    ]
+}
+_BACK_PAYLOAD = {
+    "injury_type": "Lower Back Strain / Disc Injury",
+    "body_part": "Spine / Lower Back",
+    "confidence": 92,
+    "description": "Evaluation of spinal alignment, flexion patterns, and postural control",
+    "prevention_tips": [
+        "Strengthen core musculature",
+        "Maintain neutral spine during movements",
+        "Avoid excessive forward bending",
+        "Practice proper lifting technique",
+        "Incorporate spine mobility exercises"
+    ]
+}
+_SHOULDER_PAYLOAD = {
+    "injury_type": "Rotator Cuff Strain / Shoulder Impingement",
+    "body_part": "Shoulder",
+    "confidence": 85,
+    "description": "Assessment of shoulder range, symmetry, and rotational patterns",
+    "prevention_tips": [
+        "Strengthen rotator cuff muscles",
+        "Avoid overhead movements if painful",
+        "Maintain shoulder blade stability",
+        "Balance pushing and pulling exercises"
+    ]
+}
+_HIP_PAYLOAD = {
+    "injury_type": "Hip Flexor Strain / FAI",
+    "body_part": "Hip",
+    "confidence": 82,
+    "description": "Analysis of hip mobility, symmetry, and loading patterns",
+    "prevention_tips": [
+        "Stretch hip flexors regularly",
+        "Strengthen glutes and hip stabilizers",
+        "Improve hip mobility",
+        "Avoid excessive hip flexion under load"
+    ]
+}
+_ANKLE_PAYLOAD = {
+    "injury_type": "Ankle Sprain / Instability",
+    "body_part": "Ankle",
+    "confidence": 78,
+    "description": "Evaluation of ankle stability, landing patterns, and balance control",
+    "prevention_tips": [
+        "Strengthen ankle stabilizers",
+        "Practice balance exercises",
+        "Ensure proper footwear",
+        "Warm up ankles before activity"
+    ]
+}
+_NO_RISK_PREDICTION = {
+    "injury_type": "No Significant Risks Detected",
+    "body_part": "Overall",
+    "risk_score": 10,
+    "severity": "Low",
+    "confidence": 85,
+    "description": "Movement patterns appear biomechanically sound",
+    "warning_signs": [],
+    "prevention_tips": ["Maintain current form", "Continue regular stretching"]
+}
+
+
 class InjuryPredictor:
     """
     AI-based injury risk prediction system
@@ -47,52 +144,64 @@ class InjuryPredictor:
                 "severity_multiplier": 1.1
             }
         }
+
+        # Prediction results keyed by a fingerprint of the analytics payload;
+        # bounded so a long-lived service cannot grow without limit
+        self._cache: Dict[bytes, Dict[str, Any]] = {}
+
+    def clear_cache(self) -> None:
+        """Drop memoized predictions (e.g. between test cases)"""
+        self._cache.clear()
     
-    def predict_injury_risks(self, analytics: Dict[str, Any]) -> Dict[str, Any]:
+    def predict_injury_risks(self, analytics: Dict[str, Any], pt: Any = None) -> Dict[str, Any]:
         """
         Main prediction function - analyzes all metrics to predict injury risks
         
         Args:
             analytics: Complete analytics dictionary with all computed metrics
+            pt: Optional shared PoseTensor; enables vectorized geometry
+                checks directly on the landmark tensor
             
         Returns:
             Dictionary containing injury predictions, risk scores, and recommendations
         """
+        # The prediction is deterministic in the analytics payload, so
+        # repeated calls for the same clip (re-renders, comparison views)
+        # return the memoized result instead of re-running the analyzers
+        try:
+            key = hashlib.blake2b(orjson.dumps(
+                analytics, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )).digest()
+        except TypeError:
+            key = None
+        if key is not None and key in self._cache:
+            return self._cache[key]
+
         predictions = []
         risk_factors = []
         preventive_actions = []
         
         # Extract relevant metrics
         joint_angles = analytics.get("joint_angles", {})
+        stats = self._precompute_joint_stats(joint_angles)
         symmetry = analytics.get("symmetry_analysis", {})
         posture = analytics.get("posture_metrics", {})
         motion = analytics.get("motion_metrics", {})
         anomalies = analytics.get("anomalies", {})
         
-        # 1. Analyze Knee Risk (ACL, Meniscus)
-        knee_risk = self._analyze_knee_risk(joint_angles, symmetry, motion)
-        if knee_risk["risk_score"] > 30:
-            predictions.append(knee_risk)
-        
-        # 2. Analyze Spine/Back Risk
-        back_risk = self._analyze_back_risk(joint_angles, posture)
-        if back_risk["risk_score"] > 30:
-            predictions.append(back_risk)
-        
-        # 3. Analyze Shoulder Risk
-        shoulder_risk = self._analyze_shoulder_risk(joint_angles, symmetry)
-        if shoulder_risk["risk_score"] > 30:
-            predictions.append(shoulder_risk)
-        
-        # 4. Analyze Hip Risk
-        hip_risk = self._analyze_hip_risk(joint_angles, symmetry, motion)
-        if hip_risk["risk_score"] > 30:
-            predictions.append(hip_risk)
-        
-        # 5. Analyze Ankle/Foot Risk
-        ankle_risk = self._analyze_ankle_risk(motion, anomalies)
-        if ankle_risk["risk_score"] > 30:
-            predictions.append(ankle_risk)
+        # The five analyzers share no mutable state, so fan them out over a
+        # thread pool (knee/back/shoulder/hip/ankle) and keep the risky ones
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [
+                pool.submit(self._analyze_knee_risk, stats, symmetry, motion),
+                pool.submit(self._analyze_back_risk, stats, posture, pt=pt),
+                pool.submit(self._analyze_shoulder_risk, stats, symmetry, pt=pt),
+                pool.submit(self._analyze_hip_risk, stats, symmetry, motion),
+                pool.submit(self._analyze_ankle_risk, motion, anomalies),
+            ]
+            risks = [future.result() for future in futures]
+
+        predictions.extend(risk for risk in risks if risk["risk_score"] > 30)
         
         # Sort by risk score
         predictions.sort(key=lambda x: x["risk_score"], reverse=True)
@@ -112,21 +221,12 @@ class InjuryPredictor:
         else:
             overall_level = "Minimal"
             overall_color = "safe"
-            predictions.append({
-                "injury_type": "No Significant Risks Detected",
-                "body_part": "Overall",
-                "risk_score": 10,
-                "severity": "Low",
-                "confidence": 85,
-                "description": "Movement patterns appear biomechanically sound",
-                "warning_signs": [],
-                "prevention_tips": ["Maintain current form", "Continue regular stretching"]
-            })
+            predictions.append(dict(_NO_RISK_PREDICTION))
         
         # Generate comprehensive recommendations
         recommendations = self._generate_recommendations(predictions)
         
-        return {
+        result = {
             "overall_risk_level": overall_level,
             "overall_color": overall_color,
             "predictions": predictions[:5],  # Top 5 risks
@@ -134,83 +234,90 @@ class InjuryPredictor:
             "recommendations": recommendations,
             "ai_confidence": self._calculate_confidence(analytics)
         }
+
+        if key is not None:
+            if len(self._cache) >= 64:
+                self._cache.clear()
+            self._cache[key] = result
+        return result
     
-    def _analyze_knee_risk(self, joint_angles: Dict, symmetry: Dict, motion: Dict) -> Dict:
+    @staticmethod
+    def _stepped(value: float, thresholds: Tuple, scores: Tuple, warnings: Tuple) -> Tuple:
+        """
+        Stepped scoring from a data table instead of an if/elif cascade
+
+        thresholds are ascending upper bounds; scores/warnings align with the
+        interval below each bound. Values above every bound score (0, None).
+        """
+        idx = int(np.searchsorted(thresholds, value, side="right"))
+        if idx < len(scores):
+            return scores[idx], warnings[idx]
+        return 0, None
+
+    def _analyze_knee_risk(self, stats: Dict, symmetry: Dict, motion: Dict) -> Dict:
         """Analyze ACL and knee injury risk"""
-        risk_score = 0
-        warning_signs = []
-        
-        # Check knee angles
-        left_knee = joint_angles.get("left_knee", [])
-        right_knee = joint_angles.get("right_knee", [])
-        
-        if left_knee or right_knee:
-            # Check for valgus collapse (knee caving in - angle < 170°)
-            for angles in [left_knee, right_knee]:
-                if angles:
-                    min_angle = min([a for a in angles if a is not None], default=180)
-                    if min_angle < 160:
-                        risk_score += 35
-                        warning_signs.append("Severe knee valgus (inward collapse) detected")
-                    elif min_angle < 170:
-                        risk_score += 20
-                        warning_signs.append("Moderate knee valgus observed")
-        
-        # Check symmetry
+        # Minimum knee angles flag valgus collapse (knee caving in - angle
+        # < 170°); missing joints default to a safe straight knee
+        left_min = stats.get("left_knee", (180.0,))[0]
+        right_min = stats.get("right_knee", (180.0,))[0]
         knee_symmetry = symmetry.get("by_body_part", {}).get("knees", 100)
-        if knee_symmetry < 70:
-            risk_score += 25
-            warning_signs.append("Significant left-right knee asymmetry")
-        elif knee_symmetry < 85:
-            risk_score += 10
-            warning_signs.append("Mild knee asymmetry")
-        
-        # Check for rapid movements (ACL risk factor)
         max_velocity = motion.get("max_velocity", 0)
-        if max_velocity > 0.4:
-            risk_score += 15
-            warning_signs.append("Rapid acceleration/deceleration detected")
+
+        # One boolean per severity bin, dotted with the weight vector; the
+        # warning strings come from masking the same feature vector
+        feats = np.array([
+            left_min < 160,
+            160 <= left_min < 170,
+            right_min < 160,
+            160 <= right_min < 170,
+            knee_symmetry < 70,
+            70 <= knee_symmetry < 85,
+            max_velocity > 0.4,
+        ])
+        risk_score = int(feats @ _KNEE_WEIGHTS)
+        warning_signs = [w for w, hit in zip(_KNEE_WARNINGS, feats) if hit]
         
         return {
-            "injury_type": "ACL Tear / Knee Injury",
-            "body_part": "Knee",
+            **_KNEE_PAYLOAD,
             "risk_score": min(risk_score, 100),
             "severity": "High" if risk_score >= 60 else "Moderate" if risk_score >= 40 else "Low",
-            "confidence": 88,
-            "description": "Analysis of knee alignment, symmetry, and dynamic loading patterns",
             "warning_signs": warning_signs,
-            "prevention_tips": [
-                "Strengthen quadriceps and hamstrings",
-                "Practice proper landing mechanics",
-                "Focus on controlled deceleration",
-                "Ensure knees track over toes during movements"
-            ]
         }
     
-    def _analyze_back_risk(self, joint_angles: Dict, posture: Dict) -> Dict:
+    def _analyze_back_risk(self, stats: Dict, posture: Dict, pt: Any = None) -> Dict:
         """Analyze lower back and spine injury risk"""
         risk_score = 0
         warning_signs = []
+
+        # Forward-lean geometry straight off the pose tensor when available:
+        # one vectorized comparison across every frame
+        n_frames = pt.xyz.shape[0] if pt is not None else 0
+        if n_frames:
+            valid = pt.mask[:, [11, 12, 23, 24]].all(axis=1)
+            lean = np.abs(pt.mid_shoulder[:, 0] - pt.mid_hip[:, 0])
+            lean_frames = int(np.count_nonzero(valid & (lean > 0.3)))
+            if lean_frames > 0.3 * n_frames:
+                risk_score += 20
+                warning_signs.append("Sustained forward lean relative to hips")
         
         # Check spine angle
-        spine_angles = joint_angles.get("spine", [])
-        if spine_angles:
-            avg_spine = np.mean([a for a in spine_angles if a is not None])
-            if avg_spine < 150:
-                risk_score += 30
-                warning_signs.append("Excessive spinal flexion detected")
-            elif avg_spine < 165:
-                risk_score += 15
-                warning_signs.append("Moderate forward lean observed")
+        spine_stats = stats.get("spine")
+        if spine_stats:
+            score, warning = self._stepped(
+                spine_stats[2], (150, 165), (30, 15),
+                ("Excessive spinal flexion detected",
+                 "Moderate forward lean observed"))
+            risk_score += score
+            if warning:
+                warning_signs.append(warning)
         
         # Check posture score
-        posture_score = posture.get("overall_posture_score", 100)
-        if posture_score < 60:
-            risk_score += 35
-            warning_signs.append("Poor overall posture alignment")
-        elif posture_score < 75:
-            risk_score += 20
-            warning_signs.append("Suboptimal posture detected")
+        score, warning = self._stepped(
+            posture.get("overall_posture_score", 100), (60, 75), (35, 20),
+            ("Poor overall posture alignment", "Suboptimal posture detected"))
+        risk_score += score
+        if warning:
+            warning_signs.append(warning)
         
         # Check spine alignment
         spine_alignment = posture.get("spine_alignment_score", 100)
@@ -219,38 +326,35 @@ class InjuryPredictor:
             warning_signs.append("Spine misalignment detected")
         
         return {
-            "injury_type": "Lower Back Strain / Disc Injury",
-            "body_part": "Spine / Lower Back",
+            **_BACK_PAYLOAD,
             "risk_score": min(risk_score, 100),
             "severity": "High" if risk_score >= 60 else "Moderate" if risk_score >= 40 else "Low",
-            "confidence": 92,
-            "description": "Evaluation of spinal alignment, flexion patterns, and postural control",
             "warning_signs": warning_signs,
-            "prevention_tips": [
-                "Strengthen core musculature",
-                "Maintain neutral spine during movements",
-                "Avoid excessive forward bending",
-                "Practice proper lifting technique",
-                "Incorporate spine mobility exercises"
-            ]
         }
     
-    def _analyze_shoulder_risk(self, joint_angles: Dict, symmetry: Dict) -> Dict:
+    def _analyze_shoulder_risk(self, stats: Dict, symmetry: Dict, pt: Any = None) -> Dict:
         """Analyze rotator cuff and shoulder injury risk"""
         risk_score = 0
         warning_signs = []
-        
-        # Check shoulder angles
-        left_shoulder = joint_angles.get("left_shoulder", [])
-        right_shoulder = joint_angles.get("right_shoulder", [])
+
+        # Overhead arm positioning (impingement risk) straight off the pose
+        # tensor: a wrist above its shoulder is smaller y in image coords
+        n_frames = pt.xyz.shape[0] if pt is not None else 0
+        if n_frames:
+            valid = pt.mask[:, [11, 12, 15, 16]].all(axis=1)
+            overhead = ((pt.xyz[:, 15, 1] < pt.xyz[:, 11, 1]) |
+                        (pt.xyz[:, 16, 1] < pt.xyz[:, 12, 1]))
+            overhead_frames = int(np.count_nonzero(valid & overhead))
+            if overhead_frames > 0.3 * n_frames:
+                risk_score += 15
+                warning_signs.append("Frequent overhead arm positioning detected")
         
         # Check for extreme ranges
-        for side, angles in [("left", left_shoulder), ("right", right_shoulder)]:
-            if angles:
-                max_angle = max([a for a in angles if a is not None], default=0)
-                if max_angle > 170:
-                    risk_score += 20
-                    warning_signs.append(f"Extreme {side} shoulder extension detected")
+        for side in ("left", "right"):
+            joint_stats = stats.get(f"{side}_shoulder")
+            if joint_stats and joint_stats[1] > 170:
+                risk_score += 20
+                warning_signs.append(f"Extreme {side} shoulder extension detected")
         
         # Check symmetry
         shoulder_symmetry = symmetry.get("by_body_part", {}).get("shoulders", 100)
@@ -259,38 +363,23 @@ class InjuryPredictor:
             warning_signs.append("Shoulder imbalance detected")
         
         return {
-            "injury_type": "Rotator Cuff Strain / Shoulder Impingement",
-            "body_part": "Shoulder",
+            **_SHOULDER_PAYLOAD,
             "risk_score": min(risk_score, 100),
             "severity": "Moderate" if risk_score >= 40 else "Low",
-            "confidence": 85,
-            "description": "Assessment of shoulder range, symmetry, and rotational patterns",
             "warning_signs": warning_signs,
-            "prevention_tips": [
-                "Strengthen rotator cuff muscles",
-                "Avoid overhead movements if painful",
-                "Maintain shoulder blade stability",
-                "Balance pushing and pulling exercises"
-            ]
         }
     
-    def _analyze_hip_risk(self, joint_angles: Dict, symmetry: Dict, motion: Dict) -> Dict:
+    def _analyze_hip_risk(self, stats: Dict, symmetry: Dict, motion: Dict) -> Dict:
         """Analyze hip flexor and joint injury risk"""
         risk_score = 0
         warning_signs = []
         
-        # Check hip angles
-        left_hip = joint_angles.get("left_hip", [])
-        right_hip = joint_angles.get("right_hip", [])
-        
-        for side, angles in [("left", left_hip), ("right", right_hip)]:
-            if angles:
-                range_angles = [a for a in angles if a is not None]
-                if range_angles:
-                    hip_range = max(range_angles) - min(range_angles)
-                    if hip_range > 80:
-                        risk_score += 15
-                        warning_signs.append(f"Excessive {side} hip range of motion")
+        # Check hip range of motion
+        for side in ("left", "right"):
+            joint_stats = stats.get(f"{side}_hip")
+            if joint_stats and joint_stats[3] > 80:
+                risk_score += 15
+                warning_signs.append(f"Excessive {side} hip range of motion")
         
         # Check hip symmetry
         hip_symmetry = symmetry.get("by_body_part", {}).get("hips", 100)
@@ -299,19 +388,10 @@ class InjuryPredictor:
             warning_signs.append("Hip asymmetry detected")
         
         return {
-            "injury_type": "Hip Flexor Strain / FAI",
-            "body_part": "Hip",
+            **_HIP_PAYLOAD,
             "risk_score": min(risk_score, 100),
             "severity": "Moderate" if risk_score >= 40 else "Low",
-            "confidence": 82,
-            "description": "Analysis of hip mobility, symmetry, and loading patterns",
             "warning_signs": warning_signs,
-            "prevention_tips": [
-                "Stretch hip flexors regularly",
-                "Strengthen glutes and hip stabilizers",
-                "Improve hip mobility",
-                "Avoid excessive hip flexion under load"
-            ]
         }
     
     def _analyze_ankle_risk(self, motion: Dict, anomalies: Dict) -> Dict:
@@ -338,21 +418,33 @@ class InjuryPredictor:
             warning_signs.append("Ankle mobility asymmetry")
         
         return {
-            "injury_type": "Ankle Sprain / Instability",
-            "body_part": "Ankle",
+            **_ANKLE_PAYLOAD,
             "risk_score": min(risk_score, 100),
             "severity": "Moderate" if risk_score >= 40 else "Low",
-            "confidence": 78,
-            "description": "Evaluation of ankle stability, landing patterns, and balance control",
             "warning_signs": warning_signs,
-            "prevention_tips": [
-                "Strengthen ankle stabilizers",
-                "Practice balance exercises",
-                "Ensure proper footwear",
-                "Warm up ankles before activity"
-            ]
         }
     
+    def _precompute_joint_stats(self, joint_angles: Dict) -> Dict[str, Tuple[float, float, float, float, int]]:
+        """
+        Reduce each joint-angle series to (min, max, mean, range, count)
+
+        Every _analyze_* method used to re-filter the same series before its
+        own reduction; doing the NaN-aware pass here means each series is
+        scanned exactly once per prediction. Joints with no valid samples
+        are omitted.
+        """
+        stats = {}
+        for joint, series in joint_angles.items():
+            if not series:
+                continue
+            arr = np.array(series, dtype=np.float64)
+            arr = arr[~np.isnan(arr)]
+            if arr.size:
+                lo = float(arr.min())
+                hi = float(arr.max())
+                stats[joint] = (lo, hi, float(arr.mean()), hi - lo, int(arr.size))
+        return stats
+
     def _generate_recommendations(self, predictions: List[Dict]) -> List[str]:
         """Generate comprehensive prevention recommendations"""
         recommendations = []
@@ -371,7 +463,7 @@ class InjuryPredictor:
             recommendations.append("Consider temporary activity modification until risk factors are addressed")
         
         # Body-part specific
-        body_parts = set([p["body_part"] for p in predictions[:3]])
+        body_parts = {p["body_part"] for p in predictions[:3]}
         
         if "Knee" in body_parts:
             recommendations.append("Implement neuromuscular training for knee stability")
@@ -396,14 +488,9 @@ class InjuryPredictor:
         """Calculate AI prediction confidence based on data quality"""
         confidence = 75  # Base confidence
         
-        # More frames = higher confidence
+        # More frames = higher confidence, from the module-level bonus table
         total_frames = analytics.get("summary", {}).get("total_frames", 0)
-        if total_frames > 200:
-            confidence += 15
-        elif total_frames > 100:
-            confidence += 10
-        elif total_frames > 50:
-            confidence += 5
+        confidence += _FRAME_BONUS[np.searchsorted(_FRAME_BINS, total_frames)]
         
         # Good symmetry data = higher confidence
         symmetry_score = analytics.get("symmetry_analysis", {}).get("overall_score", 0)
@@ -4,39 +4,95 @@ import numpy as np
 from typing import List, Dict, Any
 
 
+class PoseData(list):
+    """
+    List of per-frame {"landmarks": [...]} dicts with a packed array view
+
+    Behaves exactly like the JSON-friendly list of frames while also carrying
+    `landmarks_array` ((N, 33, 3) float32, NaN where undetected) and
+    `detected_mask` ((N, 33) bool) so vectorized consumers can skip the
+    dict-unpacking step entirely.
+    """
+
+    def __init__(self, frames, landmarks_array, detected_mask):
+        super().__init__(frames)
+        self.landmarks_array = landmarks_array
+        self.detected_mask = detected_mask
+
+
 class PoseEstimator:
-    def __init__(self, model_complexity=1):
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=model_complexity,
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+    def __init__(self, model_complexity=1, model_asset_path=None, delegate="cpu"):
+        """
+        Args:
+            model_complexity: Legacy-API model size (0-2)
+            model_asset_path: Optional path to a pose_landmarker .task
+                bundle; when given, inference runs through the MediaPipe
+                Tasks PoseLandmarker in VIDEO mode instead of the legacy
+                solutions API
+            delegate: "cpu" or "gpu" -- only used with the Tasks API
+        """
+        self._landmarker = None
+        self._timestamp_ms = 0
+
+        if model_asset_path:
+            from mediapipe.tasks.python import vision
+            from mediapipe.tasks.python.core.base_options import BaseOptions
+
+            options = vision.PoseLandmarkerOptions(
+                base_options=BaseOptions(
+                    model_asset_path=model_asset_path,
+                    delegate=(BaseOptions.Delegate.GPU if delegate == "gpu"
+                              else BaseOptions.Delegate.CPU),
+                ),
+                running_mode=vision.RunningMode.VIDEO,
+                min_pose_detection_confidence=0.5,
+                min_tracking_confidence=0.5,
+            )
+            self._landmarker = vision.PoseLandmarker.create_from_options(options)
+        else:
+            self.mp_pose = mp.solutions.pose
+            self.pose = self.mp_pose.Pose(
+                static_image_mode=False,
+                model_complexity=model_complexity,
+                enable_segmentation=False,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
 
     def normalize_frame(self, lm):
         """
         Normalize landmarks: center at hips and scale by torso size
         """
-        pts = [(p.x, p.y, p.z) for p in lm]
+        pts = np.fromiter(
+            (v for p in lm for v in (p.x, p.y, p.z)),
+            dtype=np.float32, count=3 * len(lm),
+        ).reshape(-1, 3)
 
         # center at mid-hip so body stays around origin
         L_HIP, R_HIP = 23, 24
-        cx = (pts[L_HIP][0] + pts[R_HIP][0]) / 2
-        cy = (pts[L_HIP][1] + pts[R_HIP][1]) / 2
-        cz = (pts[L_HIP][2] + pts[R_HIP][2]) / 2
-        pts = [(x-cx, y-cy, z-cz) for (x,y,z) in pts]
+        pts -= (pts[L_HIP] + pts[R_HIP]) / 2
 
         # scale by torso to make visible
         L_SHO, R_SHO = 11, 12
-        torso = ((pts[L_SHO][0]-pts[R_SHO][0])**2 + (pts[L_SHO][1]-pts[R_SHO][1])**2 + (pts[L_SHO][2]-pts[R_SHO][2])**2) ** 0.5
-        s = 1.0 / (torso + 1e-6)
-        pts = [(x*s, y*s, z*s) for (x,y,z) in pts]
+        torso = np.linalg.norm(pts[L_SHO] - pts[R_SHO])
+        pts /= torso + 1e-6
 
-        return [{"x":x, "y":y, "z":z} for (x,y,z) in pts]
+        # Four decimals (~0.1 mm at torso scale) is past MediaPipe's own
+        # noise floor and roughly halves the serialized payload
+        return [{"x": x, "y": y, "z": z}
+                for (x, y, z) in pts.astype(np.float64).round(4).tolist()]
 
     def extract_keypoints(self, frame_rgb):
+        if self._landmarker is not None:
+            # Tasks API: VIDEO mode needs a monotonic timestamp; a nominal
+            # 33 ms step keeps the tracker state consistent
+            image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb)
+            self._timestamp_ms += 33
+            result = self._landmarker.detect_for_video(image, self._timestamp_ms)
+            if not result.pose_world_landmarks:
+                return None
+            return self.normalize_frame(result.pose_world_landmarks[0])
+
         results = self.pose.process(frame_rgb)
         
         # Use pose_world_landmarks for true 3D
@@ -44,32 +100,54 @@ class PoseEstimator:
             return None
             
         lm = results.pose_world_landmarks.landmark
-        
-        # Debug print for first frame (or occasionally)
-        # xs = [p.x for p in lm]; ys = [p.y for p in lm]; zs = [p.z for p in lm]
-        # print(f"DEBUG: x-range ({min(xs):.2f}, {max(xs):.2f})")
-        
         return self.normalize_frame(lm)
     
-    def process_frames(self, frames: List[np.ndarray]) -> List[Dict[str, Any]]:
+    def process_frames(self, frames: List[np.ndarray], already_rgb: bool = False) -> PoseData:
         """
         Process video frames and extract pose landmarks
+
+        Pass already_rgb=True when the frames come from
+        VideoProcessor.stream_rgb_frames so the conversion is not repeated.
+
+        Returns a PoseData list carrying both the JSON-friendly frame dicts
+        and the packed (N, 33, 3) landmark array for analytics.
         """
         all_pose_data = []
-        
+        detected_rows = []
+        rgb_buf = None
+
         for frame in frames:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if already_rgb:
+                rgb_frame = frame
+            else:
+                # Reuse one conversion buffer: the frame is consumed by
+                # inference before the next iteration overwrites it
+                if rgb_buf is None or rgb_buf.shape != frame.shape:
+                    rgb_buf = np.empty_like(frame)
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
             landmarks = self.extract_keypoints(rgb_frame)
-            
+
             # Structure: { "landmarks": [ {x,y,z}, ... ] }
             if landmarks:
                 all_pose_data.append({"landmarks": landmarks})
+                detected_rows.append((len(all_pose_data) - 1,
+                                      [(lm["x"], lm["y"], lm["z"]) for lm in landmarks]))
             else:
                 # Keep frame sync with empty landmarks
                 all_pose_data.append({"landmarks": []})
-        
-        return all_pose_data
+
+        n_frames = len(all_pose_data)
+        landmarks_array = np.full((n_frames, 33, 3), np.nan, dtype=np.float32)
+        detected_mask = np.zeros((n_frames, 33), dtype=bool)
+        for i, row in detected_rows:
+            landmarks_array[i, :len(row)] = row
+            detected_mask[i, :len(row)] = True
+
+        return PoseData(all_pose_data, landmarks_array, detected_mask)
 
     def close(self):
         """Clean up MediaPipe resources"""
-        self.pose.close()
+        if self._landmarker is not None:
+            self._landmarker.close()
+        else:
+            self.pose.close()
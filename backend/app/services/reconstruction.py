@@ -31,16 +31,56 @@ class PoseReconstructor:
 
     def reconstruct_3d(self, pose_data_2d: List[Dict[int, Dict[str, float]]]) -> List[Dict[int, List[float]]]:
         """
-        Convert 2D pose landmarks to 3D coordinates using the new lift_to_3d method
+        Convert 2D pose landmarks to 3D coordinates
+
+        Gathers every point across all frames into one array, applies the
+        scale and y-flip as two broadcast ops, then splits the result back
+        into the per-frame dict shape lift_to_3d produces.
         """
-        pose_data_3d = []
-        
+        frame_ids = []
+        flat = []
         for frame_data in pose_data_2d:
             if frame_data is None:
+                frame_ids.append(None)
+                continue
+            frame_ids.append([int(idx) for idx in frame_data])
+            flat.extend((p["x"], p["y"], p["z"]) for p in frame_data.values())
+
+        coords = np.asarray(flat, dtype=np.float64).reshape(-1, 3) * self.scale_factor
+        coords[:, 1] *= -1  # invert y for Three.js coordinate feel
+        rows = coords.tolist()
+
+        pose_data_3d = []
+        pos = 0
+        for ids in frame_ids:
+            if ids is None:
                 pose_data_3d.append(None)
                 continue
-                
-            frame_3d = self.lift_to_3d(frame_data)
-            pose_data_3d.append(frame_3d)
-        
+            pose_data_3d.append({idx: rows[pos + k] for k, idx in enumerate(ids)})
+            pos += len(ids)
+
         return pose_data_3d
+
+    def apply_temporal_smoothing(self, coords: np.ndarray, window_length: int = 7, polyorder: int = 3) -> np.ndarray:
+        """
+        Smooth landmark trajectories with one batched Savitzky-Golay pass
+
+        Args:
+            coords: (T, 33, 3) array of landmark positions over time
+            window_length: Savitzky-Golay window (shrunk to fit short clips)
+            polyorder: Polynomial order of the fit
+
+        The filter runs along the time axis for every landmark component at
+        once, so there is a single savgol_filter call instead of one per
+        trajectory. Clips too short to fit the polynomial are returned
+        unchanged.
+        """
+        coords = np.asarray(coords, dtype=np.float32)
+        n_frames = coords.shape[0]
+
+        # Window must be odd and no longer than the clip
+        window_length = min(window_length, n_frames if n_frames % 2 else n_frames - 1)
+        if window_length <= polyorder:
+            return coords
+
+        return savgol_filter(coords, window_length, polyorder, axis=0, mode="nearest").astype(np.float32)
@@ -31,8 +31,6 @@ class VideoProcessor:
         Returns:
             List of frames as numpy arrays (BGR format)
         """
-        frames = []
-        
         try:
             # Open video file
             cap = cv2.VideoCapture(video_path)
@@ -43,27 +41,43 @@ class VideoProcessor:
             # Get video properties
             original_fps = cap.get(cv2.CAP_PROP_FPS)
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             
             print(f"Video FPS: {original_fps}, Total frames: {total_frames}")
             
-            # Calculate frame sampling interval
-            frame_interval = max(1, int(original_fps / self.target_fps))
-            
-            frame_count = 0
+            # Float-accumulator sampling: integer intervals truncate
+            # (29.97 fps at target 15 rounds to keep-every-frame) while the
+            # accumulator keeps the output rate honest for any fps ratio
+            dt_src = 1.0 / original_fps if original_fps > 0 else 0.0
+            dt_out = 1.0 / self.target_fps
+            
+            # Decode kept frames straight into one contiguous buffer; grab()
+            # skips the full decode + numpy allocation for dropped frames
+            buffer = None
+            if total_frames > 0 and height > 0 and width > 0:
+                keep_ratio = min(1.0, self.target_fps / original_fps) if original_fps > 0 else 1.0
+                n_out = int(total_frames * keep_ratio) + 1
+                buffer = np.empty((n_out, height, width, 3), dtype=np.uint8)
+            
+            frames = []
+            src_t = 0.0
+            next_out = 0.0
             extracted_count = 0
             
-            while True:
-                ret, frame = cap.read()
-                
-                if not ret:
-                    break
-                
+            while cap.grab():
                 # Sample frames at target FPS
-                if frame_count % frame_interval == 0:
-                    frames.append(frame)
-                    extracted_count += 1
+                if dt_src == 0.0 or src_t >= next_out - 1e-9:
+                    if buffer is not None and extracted_count < buffer.shape[0]:
+                        ret, frame = cap.retrieve(image=buffer[extracted_count])
+                    else:
+                        ret, frame = cap.retrieve()
+                    if ret:
+                        frames.append(frame)
+                        extracted_count += 1
+                        next_out += dt_out
                 
-                frame_count += 1
+                src_t += dt_src
             
             cap.release()
             
@@ -91,32 +105,84 @@ class VideoProcessor:
                 raise ValueError(f"Cannot open video file: {video_path}")
             
             original_fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_interval = max(1, int(original_fps / self.target_fps))
             
-            frame_count = 0
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+            # Same float-accumulator sampling as extract_frames; grab()
+            # avoids decoding the frames that will be dropped
+            dt_src = 1.0 / original_fps if original_fps > 0 else 0.0
+            dt_out = 1.0 / self.target_fps
+            src_t = 0.0
+            next_out = 0.0
+            
+            while cap.grab():
+                if dt_src == 0.0 or src_t >= next_out - 1e-9:
+                    ret, frame = cap.retrieve()
+                    if ret:
+                        # Resize frame to reduce memory usage
+                        if max_width:
+                            height, width = frame.shape[:2]
+                            if width > max_width:
+                                new_height = int(height * (max_width / width))
+                                frame = cv2.resize(frame, (max_width, new_height))
+                        
+                        yield frame
+                        next_out += dt_out
                 
-                if frame_count % frame_interval == 0:
-                    # Resize frame to reduce memory usage
-                    if max_width:
-                        height, width = frame.shape[:2]
-                        if width > max_width:
-                            new_height = int(height * (max_width / width))
-                            frame = cv2.resize(frame, (max_width, new_height))
-                    
-                    yield frame
-                
-                frame_count += 1
+                src_t += dt_src
             
             cap.release()
             
         except Exception as e:
             raise RuntimeError(f"Frame streaming failed: {str(e)}")
     
+    def stream_rgb_frames(self, video_path: str, max_width: int = 480):
+        """
+        Generator that yields RGB frames ready for pose inference
+
+        Prefers a single ffmpeg pass that subsamples, scales and converts to
+        RGB in one pipeline (no decode work wasted on frames that would be
+        skipped). Falls back to the cv2 read/resize/cvtColor path when
+        ffmpeg is unavailable. Driving this from a prefetch thread overlaps
+        all of it with inference.
+        """
+        if shutil.which("ffmpeg"):
+            metadata = self.validate_video(video_path)
+            if metadata.get("valid") and metadata["width"] > 0 and metadata["height"] > 0:
+                out_w = metadata["width"]
+                out_h = metadata["height"]
+                if max_width and out_w > max_width:
+                    out_h = int(out_h * (max_width / out_w))
+                    out_w = max_width
+                yield from self._ffmpeg_stream_rgb(video_path, out_w, out_h)
+                return
+
+        for frame in self.stream_frames(video_path, max_width=max_width):
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def _ffmpeg_stream_rgb(self, video_path: str, width: int, height: int):
+        """
+        Decode, subsample, scale and colour-convert in one ffmpeg pass
+
+        Frames arrive on stdout as raw rgb24 planes, so skipped frames are
+        never decoded into numpy and no per-frame cvtColor/resize calls are
+        needed on this side.
+        """
+        cmd = [
+            "ffmpeg", "-v", "error", "-i", str(video_path),
+            "-vf", f"fps={self.target_fps},scale={width}:{height}",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "pipe:1",
+        ]
+        frame_bytes = width * height * 3
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                buf = proc.stdout.read(frame_bytes)
+                if len(buf) < frame_bytes:
+                    break
+                yield np.frombuffer(buf, dtype=np.uint8).reshape(height, width, 3).copy()
+        finally:
+            proc.stdout.close()
+            proc.wait()
+
     def validate_video(self, video_path: str) -> dict:
         """
         Validate video file and return metadata
@@ -1,11 +1,10 @@
 import streamlit as st
+import hashlib
 import tempfile
 import os
 import sys
-import cv2
 import numpy as np
 import plotly.graph_objects as go
-import pandas as pd
 
 # Ensure we can import from app
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -136,69 +135,122 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize Services
+# MediaPipe Pose bone connections as start/end index arrays so the bone
+# endpoints come out of the landmark tensor with two fancy-index gathers
+_BONE_STARTS = np.array([11, 11, 13, 12, 14, 11, 12, 23, 23, 24, 25, 26, 27, 28, 29, 30], dtype=np.int32)
+_BONE_ENDS = np.array([12, 13, 15, 14, 16, 23, 24, 24, 25, 26, 27, 28, 29, 30, 31, 32], dtype=np.int32)
+
+# Viridis anchor colours expanded into a 256-entry RGB lookup table once
+# at import, so marker colours ship as literal rgb strings and the browser
+# never runs its own colorscale interpolation
+_VIRIDIS_ANCHORS = np.array([
+    [68, 1, 84], [72, 40, 120], [62, 73, 137], [49, 104, 142],
+    [38, 130, 142], [31, 158, 137], [53, 183, 121], [110, 206, 88],
+    [253, 231, 37],
+], dtype=np.float64)
+_VIRIDIS = np.stack([
+    np.interp(np.linspace(0.0, 1.0, 256),
+              np.linspace(0.0, 1.0, len(_VIRIDIS_ANCHORS)),
+              _VIRIDIS_ANCHORS[:, channel])
+    for channel in range(3)
+], axis=1).round().astype(np.uint8)
+
+# Static figure layout shared by every skeleton render
+_SKELETON_LAYOUT = dict(
+    scene=dict(
+        xaxis=dict(visible=False, showgrid=False, showbackground=False),
+        yaxis=dict(visible=False, showgrid=False, showbackground=False),
+        zaxis=dict(visible=False, showgrid=False, showbackground=False),
+        aspectmode='data',
+        bgcolor='rgba(0,0,0,0)'
+    ),
+    margin=dict(l=0, r=0, b=0, t=0),
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    height=500
+)
+
+# Speed/quality presets: MediaPipe model complexity and inference frame width
+_QUALITY_PRESETS = {
+    "Fast": {"complexity": 0, "max_width": 360},
+    "Balanced": {"complexity": 1, "max_width": 480},
+    "Accurate": {"complexity": 2, "max_width": 640},
+}
+
+
+# Initialize Services (one cached set per model complexity)
 @st.cache_resource
-def get_services():
+def get_services(complexity: int = 1):
     return {
         "video_processor": VideoProcessor(),
-        "pose_estimator": PoseEstimator(),
+        "pose_estimator": PoseEstimator(model_complexity=complexity),
         "analytics_engine": AnalyticsEngine()
     }
 
-services = get_services()
+@st.cache_data(max_entries=256, show_spinner=False)
+def plot_3d_skeleton(coords):
+    """Create Plotly 3D scatter plot for skeleton with premium styling
 
-def plot_3d_skeleton(landmarks):
-    """Create Plotly 3D scatter plot for skeleton with premium styling"""
-    if not landmarks:
+    Takes one (33, 3) slice of the packed landmark tensor (NaN rows mean
+    no detection). Memoized so scrubbing back to an already-viewed frame
+    returns the cached figure instead of rebuilding it.
+    """
+    if coords is None or len(coords) == 0 or np.isnan(coords).all():
         return go.Figure()
 
-    # MediaPipe Pose connections
-    CONNECTIONS = [
-        (11, 12), (11, 13), (13, 15), (12, 14), (14, 16), # Arms
-        (11, 23), (12, 24), (23, 24), # Torso
-        (23, 25), (24, 26), (25, 27), (26, 28), (27, 29), (28, 30), (29, 31), (30, 32) # Legs
-    ]
+    x, y, z = coords[:, 0], coords[:, 1], coords[:, 2]
+    neg_y = -y
 
-    x = [lm['x'] for lm in landmarks]
-    y = [lm['y'] for lm in landmarks]
-    z = [lm['z'] for lm in landmarks]
+    # Depth-coloured joints via the precomputed lookup table; NaN depths
+    # index entry 0, and those points have NaN coordinates anyway
+    z_min = np.nanmin(z)
+    norm = np.nan_to_num((z - z_min) / (np.nanmax(z) - z_min + 1e-9))
+    colors = [f'rgb({r},{g},{b})' for r, g, b in _VIRIDIS[(norm * 255).astype(np.int32)]]
 
     # Create scatter plot for joints
     fig = go.Figure(data=[go.Scatter3d(
-        x=x, y=z, z=[-val for val in y], # Swap Y and Z, invert Y
+        x=x, y=z, z=neg_y, # Swap Y and Z, invert Y
         mode='markers',
-        marker=dict(size=6, color=z, colorscale='Viridis', opacity=1, line=dict(color='white', width=1)),
+        marker=dict(size=6, color=colors, opacity=1, line=dict(color='white', width=1)),
         name='Joints',
         showlegend=False
     )])
 
-    # Add lines for bones
-    for start, end in CONNECTIONS:
-        if start < len(landmarks) and end < len(landmarks):
-            fig.add_trace(go.Scatter3d(
-                x=[x[start], x[end]],
-                y=[z[start], z[end]],
-                z=[-y[start], -y[end]],
-                mode='lines',
-                line=dict(color='rgba(255, 255, 255, 0.6)', width=4),
-                showlegend=False
-            ))
+    # Add all bones as one trace: each segment's endpoints followed by a
+    # NaN break, so the browser draws 2 traces instead of 17. The tensor
+    # always has 33 rows, so no per-call index validation is needed
+    bones = np.full((3, 3 * len(_BONE_STARTS)), np.nan, dtype=np.float32)
+    for axis, vals in enumerate((x, z, neg_y)):
+        bones[axis, 0::3] = vals[_BONE_STARTS]
+        bones[axis, 1::3] = vals[_BONE_ENDS]
+    fig.add_trace(go.Scatter3d(
+        x=bones[0], y=bones[1], z=bones[2],
+        mode='lines',
+        line=dict(color='rgba(255, 255, 255, 0.6)', width=4),
+        showlegend=False
+    ))
 
-    fig.update_layout(
-        scene=dict(
-            xaxis=dict(visible=False, showgrid=False, showbackground=False),
-            yaxis=dict(visible=False, showgrid=False, showbackground=False),
-            zaxis=dict(visible=False, showgrid=False, showbackground=False),
-            aspectmode='data',
-            bgcolor='rgba(0,0,0,0)'
-        ),
-        margin=dict(l=0, r=0, b=0, t=0),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        height=500
-    )
+    fig.update_layout(_SKELETON_LAYOUT)
     return fig
 
+@st.fragment
+def skeleton_viewer():
+    """Timeline slider + 3D figure, isolated so slider ticks rerun only
+    this fragment instead of the whole script"""
+    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+    st.markdown('<div class="card-title">🏃 3D Biomechanics Visualization</div>', unsafe_allow_html=True)
+
+    lm_arr = st.session_state["lm_arr"]
+    if len(lm_arr) > 1:
+        frame_idx = st.slider("Timeline", 0, len(lm_arr) - 1, 0, label_visibility="collapsed")
+    else:
+        frame_idx = 0
+
+    if len(lm_arr):
+        fig = plot_3d_skeleton(lm_arr[frame_idx])
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+    st.markdown('</div>', unsafe_allow_html=True)
+
 # --- SIDEBAR ---
 with st.sidebar:
     st.markdown("""
@@ -209,6 +261,7 @@ with st.sidebar:
     
     st.header("Upload Video")
     uploaded_file = st.file_uploader("Choose a video file", type=['mp4', 'mov', 'avi'])
+    quality = st.selectbox("Speed / Quality", list(_QUALITY_PRESETS), index=1)
     
     st.markdown("---")
     st.markdown("""
@@ -233,131 +286,156 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 if uploaded_file:
-    # Save to temp file
-    tfile = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[1])
-    tfile.write(uploaded_file.read())
-    video_path = tfile.name
+    # Results are keyed by the upload's content hash plus the quality
+    # preset, so widget interactions (slider, expanders) rerun the script
+    # without re-running the pipeline, while switching presets makes
+    # Analyze recompute instead of silently showing the old run
+    analysis_key = (hashlib.md5(uploaded_file.getbuffer()).hexdigest(), quality)
+    analyzed = st.session_state.get("analysis_key") == analysis_key
+
+    if st.button("Analyze Motion", type="primary") and not analyzed:
+        # Save to temp file
+        # Spool to memory-backed tmpfs when the host has one: the decoder
+        # needs a path, so this is the closest to decoding straight from
+        # the in-memory upload without a new decoder dependency
+        spool_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        tfile = tempfile.NamedTemporaryFile(delete=False, dir=spool_dir,
+                                            suffix=os.path.splitext(uploaded_file.name)[1])
+        # The upload already sits in memory (the hash above read it); write
+        # the memoryview straight out with no intermediate bytes copy
+        tfile.write(uploaded_file.getbuffer())
+        tfile.flush()
+        video_path = tfile.name
 
-    if st.button("Analyze Motion", type="primary"):
         with st.spinner("Processing video... Extracting 3D pose data..."):
+            preset = _QUALITY_PRESETS[quality]
+            services = get_services(preset["complexity"])
             try:
                 # Process
-                frame_gen = services["video_processor"].stream_frames(video_path)
-                pose_data = services["pose_estimator"].process_frames(frame_gen)
+                frame_gen = services["video_processor"].stream_rgb_frames(video_path, max_width=preset["max_width"])
+                pose_data = services["pose_estimator"].process_frames(frame_gen, already_rgb=True)
                 analytics = services["analytics_engine"].compute_analytics(pose_data)
-                
-                # --- DASHBOARD LAYOUT ---
-                
-                # 1. AI Injury Risk (Prominent)
-                ai_preds = analytics.get("ai_injury_prediction", {})
-                if ai_preds:
-                    risk_score = ai_preds.get("overall_risk_score", 0)
-                    risk_level = ai_preds.get("risk_level", "Unknown")
-                    
-                    st.markdown(f"""
-                    <div class="ai-risk-section">
-                        <h2 style="margin-top:0; color:#fff;">🤖 AI Injury Risk Prediction</h2>
-                        <div style="display:flex; align-items:center; gap:2rem; margin-bottom:2rem;">
-                            <div>
-                                <div style="font-size:3rem; font-weight:800; color:#ef4444;">{risk_score}</div>
-                                <div style="color:#9ca3af;">Risk Score</div>
-                            </div>
-                            <div style="flex:1; padding:1rem; background:rgba(255,255,255,0.05); border-radius:0.5rem;">
-                                <div style="font-size:1.5rem; font-weight:700; color:#fff;">{risk_level} Risk Detected</div>
-                                <div style="color:#9ca3af;">Based on joint angles, symmetry, and movement patterns.</div>
-                            </div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Injury Cards
-                    predictions = ai_preds.get("predictions", [])
-                    cols = st.columns(3)
-                    for idx, pred in enumerate(predictions):
-                        severity_class = f"risk-{pred['severity'].lower()}" if pred['severity'] in ['High', 'Medium', 'Low'] else "risk-low"
-                        with cols[idx % 3]:
-                            st.markdown(f"""
-                            <div class="risk-card {severity_class}">
-                                <h4 style="margin:0; color:#fff;">{pred['injury_type']}</h4>
-                                <div style="display:flex; justify-content:space-between; margin:0.5rem 0;">
-                                    <span style="color:#9ca3af;">Risk: {pred['risk_score']}%</span>
-                                    <span style="font-weight:bold; color:#fff;">{pred['severity']}</span>
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            with st.expander("Warning Signs & Tips"):
-                                for sign in pred['warning_signs']:
-                                    st.markdown(f"- ⚠ {sign}")
-                                for tip in pred['prevention_tips']:
-                                    st.markdown(f"- ✓ {tip}")
-
-                # 2. Main Grid (3D Viewer + Stats)
-                col_3d, col_stats = st.columns([2, 1])
-                
-                with col_3d:
-                    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-                    st.markdown('<div class="card-title">🏃 3D Biomechanics Visualization</div>', unsafe_allow_html=True)
-                    
-                    # Slider for frame selection
-                    frame_idx = st.slider("Timeline", 0, len(pose_data)-1, 0, label_visibility="collapsed")
-                    
-                    if pose_data:
-                        landmarks = pose_data[frame_idx].get("landmarks", [])
-                        fig = plot_3d_skeleton(landmarks)
-                        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-                    st.markdown('</div>', unsafe_allow_html=True)
-                
-                with col_stats:
-                    # Overall Score
-                    st.markdown(f"""
-                    <div class="glass-card">
-                        <div class="card-title">📊 Performance</div>
-                        <div style="text-align:center; margin:1rem 0;">
-                            <div style="font-size:3.5rem; font-weight:800; background: linear-gradient(135deg, #0ea5e9, #d946ef); -webkit-background-clip: text; -webkit-text-fill-color: transparent;">{analytics.get('overall_score', 0):.0f}</div>
-                            <div class="metric-label">Overall Form Score</div>
-                        </div>
-                        <div style="margin-top:1.5rem;">
-                            <div style="display:flex; justify-content:space-between; margin-bottom:0.2rem;">
-                                <span style="color:#e5e7eb;">Movement Quality</span>
-                                <span style="color:#fff;">{analytics.get('movement_quality', 0):.0f}%</span>
-                            </div>
-                            <div style="height:6px; background:#333; border-radius:3px; overflow:hidden;">
-                                <div style="width:{analytics.get('movement_quality', 0)}%; height:100%; background:linear-gradient(90deg, #0ea5e9, #d946ef);"></div>
-                            </div>
-                        </div>
-                        <div style="margin-top:1rem;">
-                            <div style="display:flex; justify-content:space-between; margin-bottom:0.2rem;">
-                                <span style="color:#e5e7eb;">Symmetry</span>
-                                <span style="color:#fff;">{analytics.get('symmetry_analysis', {}).get('overall_symmetry', 0):.0f}%</span>
-                            </div>
-                            <div style="height:6px; background:#333; border-radius:3px; overflow:hidden;">
-                                <div style="width:{analytics.get('symmetry_analysis', {}).get('overall_symmetry', 0)}%; height:100%; background:linear-gradient(90deg, #10b981, #3b82f6);"></div>
-                            </div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Key Insights
-                    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-                    st.markdown('<div class="card-title">💡 Key Insights</div>', unsafe_allow_html=True)
-                    
-                    # Mock insights based on score (since we don't have text generation here without LLM)
-                    score = analytics.get('overall_score', 0)
-                    if score > 80:
-                        st.success("Excellent form! Maintain current posture.")
-                    elif score > 60:
-                        st.warning("Good form, but room for improvement in stability.")
-                    else:
-                        st.error("Form needs attention. Focus on symmetry.")
-                    
-                    st.markdown('</div>', unsafe_allow_html=True)
 
+                st.session_state["pose_data"] = pose_data
+                st.session_state["lm_arr"] = pose_data.landmarks_array
+                st.session_state["analytics"] = analytics
+                st.session_state["analysis_key"] = analysis_key
+                analyzed = True
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
             finally:
                 if os.path.exists(video_path):
                     os.unlink(video_path)
 
+    if analyzed:
+        pose_data = st.session_state["pose_data"]
+        lm_arr = st.session_state["lm_arr"]
+        analytics = st.session_state["analytics"]
+
+        # --- DASHBOARD LAYOUT ---
+        
+        # 1. AI Injury Risk (Prominent)
+        ai_preds = analytics.get("ai_injury_prediction", {})
+        if ai_preds:
+            risk_score = ai_preds.get("overall_risk_score", 0)
+            risk_level = ai_preds.get("risk_level", "Unknown")
+            
+            st.markdown(f"""
+            <div class="ai-risk-section">
+                <h2 style="margin-top:0; color:#fff;">🤖 AI Injury Risk Prediction</h2>
+                <div style="display:flex; align-items:center; gap:2rem; margin-bottom:2rem;">
+                    <div>
+                        <div style="font-size:3rem; font-weight:800; color:#ef4444;">{risk_score}</div>
+                        <div style="color:#9ca3af;">Risk Score</div>
+                    </div>
+                    <div style="flex:1; padding:1rem; background:rgba(255,255,255,0.05); border-radius:0.5rem;">
+                        <div style="font-size:1.5rem; font-weight:700; color:#fff;">{risk_level} Risk Detected</div>
+                        <div style="color:#9ca3af;">Based on joint angles, symmetry, and movement patterns.</div>
+                    </div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Injury Cards: batch the static card HTML into one markdown
+            # call per column (each call is its own protocol message to the
+            # browser), then emit the interactive expanders below
+            predictions = ai_preds.get("predictions", [])
+            cols = st.columns(3)
+            for col_idx, col in enumerate(cols):
+                col_preds = predictions[col_idx::3]
+                if not col_preds:
+                    continue
+                cards = []
+                for pred in col_preds:
+                    severity_class = f"risk-{pred['severity'].lower()}" if pred['severity'] in ['High', 'Medium', 'Low'] else "risk-low"
+                    cards.append(f"""
+                    <div class="risk-card {severity_class}">
+                        <h4 style="margin:0; color:#fff;">{pred['injury_type']}</h4>
+                        <div style="display:flex; justify-content:space-between; margin:0.5rem 0;">
+                            <span style="color:#9ca3af;">Risk: {pred['risk_score']}%</span>
+                            <span style="font-weight:bold; color:#fff;">{pred['severity']}</span>
+                        </div>
+                    </div>
+                    """)
+                with col:
+                    st.markdown("\n".join(cards), unsafe_allow_html=True)
+                    for pred in col_preds:
+                        with st.expander("Warning Signs & Tips"):
+                            lines = [f"- ⚠ {sign}" for sign in pred['warning_signs']]
+                            lines += [f"- ✓ {tip}" for tip in pred['prevention_tips']]
+                            st.markdown("\n".join(lines))
+
+        # 2. Main Grid (3D Viewer + Stats)
+        col_3d, col_stats = st.columns([2, 1])
+        
+        with col_3d:
+            skeleton_viewer()
+        
+        with col_stats:
+            # Overall Score
+            st.markdown(f"""
+            <div class="glass-card">
+                <div class="card-title">📊 Performance</div>
+                <div style="text-align:center; margin:1rem 0;">
+                    <div style="font-size:3.5rem; font-weight:800; background: linear-gradient(135deg, #0ea5e9, #d946ef); -webkit-background-clip: text; -webkit-text-fill-color: transparent;">{analytics.get('overall_score', 0):.0f}</div>
+                    <div class="metric-label">Overall Form Score</div>
+                </div>
+                <div style="margin-top:1.5rem;">
+                    <div style="display:flex; justify-content:space-between; margin-bottom:0.2rem;">
+                        <span style="color:#e5e7eb;">Movement Quality</span>
+                        <span style="color:#fff;">{analytics.get('movement_quality', 0):.0f}%</span>
+                    </div>
+                    <div style="height:6px; background:#333; border-radius:3px; overflow:hidden;">
+                        <div style="width:{analytics.get('movement_quality', 0)}%; height:100%; background:linear-gradient(90deg, #0ea5e9, #d946ef);"></div>
+                    </div>
+                </div>
+                <div style="margin-top:1rem;">
+                    <div style="display:flex; justify-content:space-between; margin-bottom:0.2rem;">
+                        <span style="color:#e5e7eb;">Symmetry</span>
+                        <span style="color:#fff;">{analytics.get('symmetry_analysis', {}).get('overall_symmetry', 0):.0f}%</span>
+                    </div>
+                    <div style="height:6px; background:#333; border-radius:3px; overflow:hidden;">
+                        <div style="width:{analytics.get('symmetry_analysis', {}).get('overall_symmetry', 0)}%; height:100%; background:linear-gradient(90deg, #10b981, #3b82f6);"></div>
+                    </div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Key Insights
+            st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+            st.markdown('<div class="card-title">💡 Key Insights</div>', unsafe_allow_html=True)
+            
+            # Mock insights based on score (since we don't have text generation here without LLM)
+            score = analytics.get('overall_score', 0)
+            if score > 80:
+                st.success("Excellent form! Maintain current posture.")
+            elif score > 60:
+                st.warning("Good form, but room for improvement in stability.")
+            else:
+                st.error("Form needs attention. Focus on symmetry.")
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+
 else:
     # Empty State
     st.markdown("""